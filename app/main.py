@@ -1,10 +1,20 @@
-from typing import List
+import itertools
+from array import array
+from dataclasses import dataclass, field
+from typing import Any, Callable, ClassVar, Iterable, List
 
+import orjson
 from fastapi import FastAPI, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel, Field
 
-app = FastAPI(title="Warehouse Operations API", version="1.0.0")
+app = FastAPI(
+    title="Warehouse Operations API",
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+)
 
 app.add_middleware(
     CORSMiddleware,
@@ -13,17 +23,24 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Small bodies are sent as-is; larger ones (mostly GET /inventory) are
+# compressed at a moderate level to keep the CPU cost low.
+app.add_middleware(GZipMiddleware, minimum_size=512, compresslevel=5)
+
+
+# Quantities are stored in a signed 64-bit array column.
+_MAX_QUANTITY = 2**63 - 1
 
 
 class InventoryCreate(BaseModel):
     name: str = Field(..., min_length=1, max_length=100)
-    quantity: int = Field(..., ge=0)
+    quantity: int = Field(..., ge=0, le=_MAX_QUANTITY)
     price: float = Field(..., ge=0)
 
 
 class InventoryUpdate(BaseModel):
     name: str | None = Field(None, min_length=1, max_length=100)
-    quantity: int | None = Field(None, ge=0)
+    quantity: int | None = Field(None, ge=0, le=_MAX_QUANTITY)
     price: float | None = Field(None, ge=0)
 
 
@@ -47,125 +64,331 @@ class OrderOut(OrderCreate):
     id: int
 
 
+# Pydantic v2 builds each validator when the class is defined, so
+# model_rebuild() has nothing left to do; validating one sample per input
+# model moves pydantic-core's one-off first-call setup to import time.
+for _model, _sample in (
+    (InventoryCreate, {"name": "warmup", "quantity": 0, "price": 0.0}),
+    (InventoryUpdate, {}),
+    (OrderCreate, {"customer": "warmup"}),
+    (OrderUpdate, {}),
+):
+    _model.model_validate(_sample)
+del _model, _sample
+
+
+@dataclass(slots=True)
+class OrderRecord:
+    """Stored order, serialized by orjson directly as a dataclass."""
+
+    id: int
+    customer: str
+    items: list[int]
+    status: str
+
+
+@dataclass(slots=True)
+class InventoryTable:
+    """Inventory stored column-wise, one parallel array per field.
+
+    Rows are kept contiguous: deleting an item moves the last row into the
+    freed slot, so list order is not preserved across deletes.
+    """
+
+    ids: array = field(default_factory=lambda: array("q"))
+    names: list[str] = field(default_factory=list)
+    quantities: array = field(default_factory=lambda: array("q"))
+    prices: array = field(default_factory=lambda: array("d"))
+    # Each row pre-encoded as a JSON object; see ``encode_row``.
+    rows_json: list[bytes] = field(default_factory=list)
+    id_to_index: dict[int, int] = field(default_factory=dict)
+
+    # Record field name -> column attribute holding it.
+    COLUMNS: ClassVar[dict[str, str]] = {
+        "name": "names",
+        "quantity": "quantities",
+        "price": "prices",
+    }
+
+    def __contains__(self, item_id: int) -> bool:
+        return item_id in self.id_to_index
+
+    def put(self, item_id: int, name: str, quantity: int, price: float) -> int:
+        index = self.id_to_index.get(item_id)
+        if index is None:
+            index = self.id_to_index[item_id] = len(self.ids)
+            self.ids.append(item_id)
+            self.names.append(name)
+            self.quantities.append(quantity)
+            self.prices.append(price)
+            self.rows_json.append(b"")
+        else:
+            self.names[index] = name
+            self.quantities[index] = quantity
+            self.prices[index] = price
+        self.encode_row(index)
+        return index
+
+    def encode_row(self, index: int) -> bytes:
+        """Re-encode row ``index``; must follow any write to its columns."""
+        row_json = self.rows_json[index] = orjson.dumps(
+            {
+                "id": self.ids[index],
+                "name": self.names[index],
+                "quantity": self.quantities[index],
+                "price": self.prices[index],
+            }
+        )
+        return row_json
+
+    def remove(self, item_id: int) -> None:
+        index = self.id_to_index.pop(item_id)
+        last = len(self.ids) - 1
+        if index != last:
+            moved_id = self.ids[last]
+            self.ids[index] = moved_id
+            self.names[index] = self.names[last]
+            self.quantities[index] = self.quantities[last]
+            self.prices[index] = self.prices[last]
+            self.rows_json[index] = self.rows_json[last]
+            self.id_to_index[moved_id] = index
+        self.ids.pop()
+        self.names.pop()
+        self.quantities.pop()
+        self.prices.pop()
+        self.rows_json.pop()
+
+    def clear(self) -> None:
+        del self.ids[:]
+        self.names.clear()
+        del self.quantities[:]
+        del self.prices[:]
+        self.rows_json.clear()
+        self.id_to_index.clear()
+
+    def to_json(self) -> bytes:
+        # Rows are encoded at write time, so listing is a single bytes join.
+        return b"[" + b",".join(self.rows_json) + b"]"
+
+
+inventory = InventoryTable()
+orders: dict[int, OrderRecord] = {}
+# Inverted index of inventory item id -> ids of the orders referencing it.
+item_to_orders: dict[int, set[int]] = {}
+# Id generators; next() hands out 1, 2, 3, ...
+inventory_ids = itertools.count(1)
+order_ids = itertools.count(1)
+# Serialized response bodies, rebuilt lazily after any write touches them.
+# Only the async handlers below read or fill them, on the event loop thread.
+_inventory_cache: bytes | None = None
+_order_cache: dict[int, bytes] = {}
+
+
 def _reset_state() -> None:
-    global inventory, orders, inventory_counter, order_counter
-    inventory = {}
-    orders = {}
-    inventory_counter = 0
-    order_counter = 0
+    # Containers are cleared in place so references to them stay valid; only
+    # the id generators, which cannot be rewound, are replaced.
+    global inventory_ids, order_ids, _inventory_cache
+    inventory.clear()
+    orders.clear()
+    item_to_orders.clear()
+    _order_cache.clear()
+    _inventory_cache = None
+    inventory_ids = itertools.count(1)
+    order_ids = itertools.count(1)
+
+
+def _payload_fields(payload: BaseModel) -> dict[str, Any]:
+    # Payloads are validated once on the way in; reading their fields directly
+    # avoids running them back through Pydantic's serializer via model_dump().
+    return dict(payload.__dict__)
+
+
+def _compile_patch(
+    name: str, model: type[BaseModel], target: Callable[[str], str]
+) -> Callable[[Any, int, BaseModel], None]:
+    # Generates one straight-line ``if patch.<field> is not None`` store per
+    # field of ``model``; ``target`` renders the expression assigned to.
+    lines = [f"def {name}(target, key, patch):"]
+    for field_name in model.model_fields:
+        lines.append(f"    if patch.{field_name} is not None:")
+        lines.append(f"        {target(field_name)} = patch.{field_name}")
+    namespace: dict[str, Any] = {}
+    exec("\n".join(lines), namespace)
+    return namespace[name]
+
+
+# Partial updates skip fields that are unset or null, mirroring the schema of
+# the update models at import time.
+_apply_inventory_patch = _compile_patch(
+    "_apply_inventory_patch",
+    InventoryUpdate,
+    lambda field_name: f"target.{InventoryTable.COLUMNS[field_name]}[key]",
+)
+_apply_order_patch = _compile_patch(
+    "_apply_order_patch",
+    OrderUpdate,
+    lambda field_name: f"target[key].{field_name}",
+)
+
+
+def _invalidate_inventory_cache() -> None:
+    global _inventory_cache
+    _inventory_cache = None
 
 
-_reset_state()
+def _json_bytes_response(content: bytes, status_code: int = 200) -> Response:
+    return Response(
+        content=content,
+        status_code=status_code,
+        media_type="application/json",
+    )
 
 
-@app.get("/inventory", response_model=List[InventoryOut])
-def list_inventory() -> List[InventoryOut]:
-    return list(inventory.values())
+# Response bodies are not validated on the way out: every stored record is
+# built from a payload that passed the input models, so correctness is
+# enforced at write time. The output models are only referenced through
+# ``responses`` to document the schema in OpenAPI.
+#
+# Handlers are ``async def`` although none of them awaits: that keeps them on
+# the event loop, so each request's reads and writes of the shared state run
+# without interleaving. Sync handlers would run concurrently in FastAPI's
+# threadpool and could corrupt the parallel InventoryTable columns.
+@app.get("/inventory", responses={200: {"model": List[InventoryOut]}})
+async def list_inventory() -> Response:
+    global _inventory_cache
+    # Check, encode and store happen without an await in between, so no
+    # write can invalidate the cache while a stale body is being filled in.
+    if _inventory_cache is None:
+        _inventory_cache = inventory.to_json()
+    return _json_bytes_response(_inventory_cache)
 
 
-@app.post("/inventory", response_model=InventoryOut, status_code=201)
-def create_inventory(payload: InventoryCreate) -> InventoryOut:
-    global inventory_counter
-    inventory_counter += 1
-    record = {"id": inventory_counter, **payload.model_dump()}
-    inventory[inventory_counter] = record
-    return record
+@app.post("/inventory", status_code=201, responses={201: {"model": InventoryOut}})
+async def create_inventory(payload: InventoryCreate) -> Response:
+    index = inventory.put(next(inventory_ids), payload.name, payload.quantity, payload.price)
+    _invalidate_inventory_cache()
+    return _json_bytes_response(inventory.rows_json[index], status_code=201)
 
 
-@app.put("/inventory/{item_id}", response_model=InventoryOut)
-def replace_inventory(item_id: int, payload: InventoryCreate) -> InventoryOut:
+@app.put("/inventory/{item_id}", responses={200: {"model": InventoryOut}})
+async def replace_inventory(item_id: int, payload: InventoryCreate) -> Response:
     if item_id not in inventory:
         raise HTTPException(status_code=404, detail="Inventory item not found")
 
-    record = {"id": item_id, **payload.model_dump()}
-    inventory[item_id] = record
-    return record
+    index = inventory.put(item_id, payload.name, payload.quantity, payload.price)
+    _invalidate_inventory_cache()
+    return _json_bytes_response(inventory.rows_json[index])
 
 
-@app.patch("/inventory/{item_id}", response_model=InventoryOut)
-def patch_inventory(item_id: int, payload: InventoryUpdate) -> InventoryOut:
+@app.patch("/inventory/{item_id}", responses={200: {"model": InventoryOut}})
+async def patch_inventory(item_id: int, payload: InventoryUpdate) -> Response:
     if item_id not in inventory:
         raise HTTPException(status_code=404, detail="Inventory item not found")
 
-    current = inventory[item_id].copy()
-    updates = payload.model_dump(exclude_unset=True)
-    current.update(updates)
-    inventory[item_id] = current
-    return current
+    index = inventory.id_to_index[item_id]
+    _apply_inventory_patch(inventory, index, payload)
+    _invalidate_inventory_cache()
+    return _json_bytes_response(inventory.encode_row(index))
 
 
 @app.delete("/inventory/{item_id}", status_code=204)
-def delete_inventory(item_id: int) -> Response:
+async def delete_inventory(item_id: int) -> Response:
     if item_id not in inventory:
         raise HTTPException(status_code=404, detail="Inventory item not found")
 
     # Clean up any order references to the deleted item.
-    for order in orders.values():
-        if item_id in order["items"]:
-            order["items"] = [i for i in order["items"] if i != item_id]
-    del inventory[item_id]
+    # Items keep their submitted order and duplicates, so they stay a list;
+    # the index guarantees each of these orders holds the id at least once.
+    for order_id in item_to_orders.pop(item_id, ()):
+        items = orders[order_id].items
+        items.remove(item_id)
+        while item_id in items:
+            items.remove(item_id)
+        _order_cache.pop(order_id, None)
+    inventory.remove(item_id)
+    _invalidate_inventory_cache()
     return Response(status_code=204)
 
 
-@app.post("/orders", response_model=OrderOut, status_code=201)
-def create_order(payload: OrderCreate) -> OrderOut:
-    global order_counter
+@app.post("/orders", status_code=201, responses={201: {"model": OrderOut}})
+async def create_order(payload: OrderCreate) -> Response:
     _validate_order_items(payload.items)
-    order_counter += 1
-    record = {"id": order_counter, **payload.model_dump()}
-    orders[order_counter] = record
-    return record
+    order_id = next(order_ids)
+    record = OrderRecord(id=order_id, **_payload_fields(payload))
+    orders[order_id] = record
+    _index_order_items(order_id, (), record.items)
+    return ORJSONResponse(record, status_code=201)
 
 
-@app.get("/orders/{order_id}", response_model=OrderOut)
-def read_order(order_id: int) -> OrderOut:
+@app.get("/orders/{order_id}", responses={200: {"model": OrderOut}})
+async def read_order(order_id: int) -> Response:
     if order_id not in orders:
         raise HTTPException(status_code=404, detail="Order not found")
-    return orders[order_id]
+
+    # Filled without yielding to the event loop; see list_inventory.
+    body = _order_cache.get(order_id)
+    if body is None:
+        body = _order_cache[order_id] = orjson.dumps(orders[order_id])
+    return _json_bytes_response(body)
 
 
-@app.put("/orders/{order_id}", response_model=OrderOut)
-def replace_order(order_id: int, payload: OrderCreate) -> OrderOut:
+@app.put("/orders/{order_id}", responses={200: {"model": OrderOut}})
+async def replace_order(order_id: int, payload: OrderCreate) -> Response:
     if order_id not in orders:
         raise HTTPException(status_code=404, detail="Order not found")
 
     _validate_order_items(payload.items)
-    record = {"id": order_id, **payload.model_dump()}
+    record = OrderRecord(id=order_id, **_payload_fields(payload))
+    _index_order_items(order_id, orders[order_id].items, record.items)
     orders[order_id] = record
-    return record
+    _order_cache.pop(order_id, None)
+    return ORJSONResponse(record)
 
 
-@app.patch("/orders/{order_id}", response_model=OrderOut)
-def patch_order(order_id: int, payload: OrderUpdate) -> OrderOut:
+@app.patch("/orders/{order_id}", responses={200: {"model": OrderOut}})
+async def patch_order(order_id: int, payload: OrderUpdate) -> Response:
     if order_id not in orders:
         raise HTTPException(status_code=404, detail="Order not found")
 
-    updates = payload.model_dump(exclude_unset=True)
-    if "items" in updates:
-        _validate_order_items(updates["items"])
-    current = orders[order_id].copy()
-    current.update(updates)
-    orders[order_id] = current
-    return current
+    previous_items = orders[order_id].items
+    if payload.items is not None:
+        _validate_order_items(payload.items)
+    _apply_order_patch(orders, order_id, payload)
+    if payload.items is not None:
+        _index_order_items(order_id, previous_items, payload.items)
+    _order_cache.pop(order_id, None)
+    return ORJSONResponse(orders[order_id])
 
 
 @app.delete("/orders/{order_id}", status_code=204)
-def delete_order(order_id: int) -> Response:
+async def delete_order(order_id: int) -> Response:
     if order_id not in orders:
         raise HTTPException(status_code=404, detail="Order not found")
-    del orders[order_id]
+    _index_order_items(order_id, orders.pop(order_id).items, ())
+    _order_cache.pop(order_id, None)
     return Response(status_code=204)
 
 
 def _validate_order_items(item_ids: List[int]) -> None:
-    missing = [item_id for item_id in item_ids if item_id not in inventory]
+    missing = set(item_ids).difference(inventory.id_to_index)
     if missing:
         raise HTTPException(
             status_code=400,
-            detail=f"Items not found in inventory: {missing}",
+            detail=f"Items not found in inventory: {sorted(missing)}",
         )
 
 
+def _index_order_items(order_id: int, old_items: Iterable[int], new_items: Iterable[int]) -> None:
+    old, new = set(old_items), set(new_items)
+    for item_id in old - new:
+        referencing = item_to_orders[item_id]
+        referencing.discard(order_id)
+        if not referencing:
+            del item_to_orders[item_id]
+    for item_id in new - old:
+        item_to_orders.setdefault(item_id, set()).add(order_id)
+
+
 def reset_state() -> None:
     _reset_state()
 
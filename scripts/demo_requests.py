@@ -6,13 +6,15 @@ requests using httpx, prints the responses, and then shuts the server down.
 
 from __future__ import annotations
 
+import asyncio
 import json
 import os
+import socket
 import subprocess
 import sys
 import time
 from pathlib import Path
-from typing import Any, Iterable
+from typing import Any
 
 import httpx
 
@@ -21,6 +23,10 @@ APP_IMPORT_PATH = "app.main:app"
 SERVER_HOST = "127.0.0.1"
 SERVER_PORT = 8000
 BASE_URL = f"http://{SERVER_HOST}:{SERVER_PORT}"
+# The API keeps its state in module globals, so every worker process would
+# hold its own inventory and orders. Scaling past one worker needs that state
+# moved into a shared store first; the demo stays on a single process.
+SERVER_WORKERS = 1
 
 
 def _print_response(label: str, response: httpx.Response) -> None:
@@ -41,96 +47,116 @@ def _print_response(label: str, response: httpx.Response) -> None:
 
 
 def _wait_for_server(timeout: float = 15.0) -> None:
-    start = time.perf_counter()
-    with httpx.Client() as client:
-        while time.perf_counter() - start < timeout:
-            try:
-                client.get(BASE_URL + "/inventory", timeout=0.5)
-            except httpx.HTTPError:
-                time.sleep(0.2)
-                continue
-            return
-    raise RuntimeError("Server did not become ready in time")
-
-
-def _exercise_endpoints() -> None:
-    with httpx.Client(base_url=BASE_URL) as client:
-        _print_response("GET /inventory", client.get("/inventory"))
+    deadline = time.perf_counter() + timeout
+    # Poll with bare TCP connects, which are far cheaper than full HTTP
+    # requests, and confirm with a single GET once the port accepts.
+    while True:
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as probe:
+            probe.settimeout(0.5)
+            if probe.connect_ex((SERVER_HOST, SERVER_PORT)) == 0:
+                break
+        if time.perf_counter() >= deadline:
+            raise RuntimeError("Server did not become ready in time")
+        time.sleep(0.05)
 
-        widget = client.post(
-            "/inventory",
-            json={"name": "Widget", "quantity": 10, "price": 12.5},
+    try:
+        httpx.get(BASE_URL + "/inventory", timeout=max(deadline - time.perf_counter(), 0.5))
+    except httpx.HTTPError as exc:
+        raise RuntimeError("Server did not become ready in time") from exc
+
+
+async def _exercise_endpoints() -> None:
+    # One pooled keep-alive client; requests that do not depend on each other
+    # are issued concurrently, dependent ones stay sequential.
+    limits = httpx.Limits(max_keepalive_connections=8)
+    async with httpx.AsyncClient(base_url=BASE_URL, limits=limits) as client:
+        _print_response("GET /inventory", await client.get("/inventory"))
+
+        widget, gadget = await asyncio.gather(
+            client.post(
+                "/inventory",
+                json={"name": "Widget", "quantity": 10, "price": 12.5},
+            ),
+            client.post(
+                "/inventory",
+                json={"name": "Gadget", "quantity": 5, "price": 32.0},
+            ),
         )
         _print_response("POST /inventory", widget)
-        widget_id = widget.json()["id"]
-
-        gadget = client.post(
-            "/inventory",
-            json={"name": "Gadget", "quantity": 5, "price": 32.0},
-        )
         _print_response("POST /inventory (second)", gadget)
+        widget_id = widget.json()["id"]
+        gadget_id = gadget.json()["id"]
 
-        inventory_full = client.get("/inventory")
+        inventory_full = await client.get("/inventory")
         _print_response("GET /inventory (after inserts)", inventory_full)
 
-        replace_widget = client.put(
+        replace_widget = await client.put(
             f"/inventory/{widget_id}",
             json={"name": "Widget", "quantity": 25, "price": 11.0},
         )
         _print_response("PUT /inventory/{id}", replace_widget)
 
-        patch_widget = client.patch(
-            f"/inventory/{widget_id}",
-            json={"price": 9.99},
+        patch_widget, order = await asyncio.gather(
+            client.patch(
+                f"/inventory/{widget_id}",
+                json={"price": 9.99},
+            ),
+            client.post(
+                "/orders",
+                json={
+                    "customer": "Ada Lovelace",
+                    "items": [widget_id, gadget_id],
+                    "status": "pending",
+                },
+            ),
         )
         _print_response("PATCH /inventory/{id}", patch_widget)
-
-        order = client.post(
-            "/orders",
-            json={
-                "customer": "Ada Lovelace",
-                "items": [widget_id, gadget.json()["id"]],
-                "status": "pending",
-            },
-        )
         _print_response("POST /orders", order)
         order_id = order.json()["id"]
 
-        order_detail = client.get(f"/orders/{order_id}")
+        order_detail = await client.get(f"/orders/{order_id}")
         _print_response("GET /orders/{id}", order_detail)
 
-        replace_order = client.put(
+        replace_order = await client.put(
             f"/orders/{order_id}",
             json={
                 "customer": "Ada Lovelace",
-                "items": [gadget.json()["id"]],
+                "items": [gadget_id],
                 "status": "confirmed",
             },
         )
         _print_response("PUT /orders/{id}", replace_order)
 
-        patch_order = client.patch(
+        patch_order = await client.patch(
             f"/orders/{order_id}",
             json={"status": "shipped"},
         )
         _print_response("PATCH /orders/{id}", patch_order)
 
-        delete_order = client.delete(f"/orders/{order_id}")
+        delete_order, delete_widget = await asyncio.gather(
+            client.delete(f"/orders/{order_id}"),
+            client.delete(f"/inventory/{widget_id}"),
+        )
         _print_response("DELETE /orders/{id}", delete_order)
-
-        delete_widget = client.delete(f"/inventory/{widget_id}")
         _print_response("DELETE /inventory/{id}", delete_widget)
 
 
 def _start_server() -> subprocess.Popen[Any]:
     env = os.environ.copy()
     env["PYTHONPATH"] = str(REPO_ROOT) + os.pathsep + env.get("PYTHONPATH", "")
-    command: Iterable[str] = (
+    command: list[str] = [
         sys.executable,
         "-m",
         "uvicorn",
         APP_IMPORT_PATH,
-    )
+        "--http",
+        "httptools",
+        "--workers",
+        str(SERVER_WORKERS),
+        "--no-access-log",
+    ]
+    if sys.platform != "win32":  # uvloop is not available on Windows
+        command += ["--loop", "uvloop"]
     creationflags = 0
     if sys.platform == "win32":  # isolate console signals from parent process
         creationflags = subprocess.CREATE_NEW_PROCESS_GROUP
@@ -148,7 +174,7 @@ def main() -> None:
     server = _start_server()
     try:
         _wait_for_server()
-        _exercise_endpoints()
+        asyncio.run(_exercise_endpoints())
     finally:
         if server.poll() is None:
             server.terminate()
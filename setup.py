@@ -0,0 +1,65 @@
+"""Optional native build of the API module.
+
+``python setup.py build_ext --inplace`` compiles ``app/main.py`` with Cython
+into an extension module that Python imports in preference to the source file.
+Without Cython, or when the C compiler is missing or fails, the build is
+skipped with a warning and ``app.main`` keeps running as plain Python, so the
+service never depends on the extension.
+"""
+
+import warnings
+
+from setuptools import Extension, setup
+from setuptools.command.build_ext import build_ext
+from setuptools.errors import CCompilerError, ExecError, PlatformError
+
+_BUILD_ERRORS = (CCompilerError, ExecError, PlatformError)
+
+
+class optional_build_ext(build_ext):
+    """Warn instead of failing when the extension cannot be compiled."""
+
+    skipped = False
+
+    def run(self) -> None:
+        try:
+            super().run()
+        except _BUILD_ERRORS as exc:
+            self._skip(exc)
+
+    def build_extension(self, ext: Extension) -> None:
+        try:
+            super().build_extension(ext)
+        except _BUILD_ERRORS as exc:
+            self._skip(exc)
+
+    def copy_extensions_to_source(self) -> None:
+        # --inplace would otherwise try to copy the extension that never built.
+        if not self.skipped:
+            super().copy_extensions_to_source()
+
+    def _skip(self, exc: Exception) -> None:
+        self.skipped = True
+        warnings.warn(
+            f"Could not compile the app.main extension ({exc}); "
+            "the pure Python module will be used instead."
+        )
+
+
+try:
+    from Cython.Build import cythonize
+except ImportError:  # no Cython available: keep the pure Python module
+    ext_modules = []
+else:
+    ext_modules = cythonize(
+        [Extension("app.main", ["app/main.py"])],
+        language_level=3,
+        compiler_directives={"boundscheck": False, "wraparound": False},
+    )
+
+setup(
+    name="warehouse-operations-api",
+    version="1.0.0",
+    ext_modules=ext_modules,
+    cmdclass={"build_ext": optional_build_ext},
+)
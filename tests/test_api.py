@@ -1,10 +1,18 @@
+from typing import Iterator
+
+import pytest
 from fastapi.testclient import TestClient
 
 from app.main import app, reset_state
 
+CLIENT = TestClient(app)
+
 
-def get_client() -> TestClient:
-    return TestClient(app)
+@pytest.fixture(scope="session", autouse=True)
+def client_lifespan() -> Iterator[None]:
+    # Enter the app lifespan once for the whole run instead of once per test.
+    with CLIENT:
+        yield
 
 
 def setup_function() -> None:
@@ -16,88 +24,149 @@ def teardown_function() -> None:
 
 
 def test_inventory_crud_flow() -> None:
-    with get_client() as client:
-        create_resp = client.post(
-            "/inventory",
-            json={"name": "Widget", "quantity": 10, "price": 12.5},
-        )
-        assert create_resp.status_code == 201
-        item = create_resp.json()
-
-        list_resp = client.get("/inventory")
-        assert list_resp.status_code == 200
-        assert any(entry["id"] == item["id"] for entry in list_resp.json())
-
-        put_resp = client.put(
-            f"/inventory/{item['id']}",
-            json={"name": "Widget", "quantity": 25, "price": 11.0},
-        )
-        assert put_resp.status_code == 200
-        assert put_resp.json()["quantity"] == 25
-
-        patch_resp = client.patch(
-            f"/inventory/{item['id']}",
-            json={"price": 9.99},
-        )
-        assert patch_resp.status_code == 200
-        assert patch_resp.json()["price"] == 9.99
-
-        delete_resp = client.delete(f"/inventory/{item['id']}")
-        assert delete_resp.status_code == 204
-
-        list_after_delete = client.get("/inventory")
-        assert list_after_delete.status_code == 200
-        assert item["id"] not in {entry["id"] for entry in list_after_delete.json()}
+    client = CLIENT
+    create_resp = client.post(
+        "/inventory",
+        json={"name": "Widget", "quantity": 10, "price": 12.5},
+    )
+    assert create_resp.status_code == 201
+    item = create_resp.json()
+
+    list_resp = client.get("/inventory")
+    assert list_resp.status_code == 200
+    assert any(entry["id"] == item["id"] for entry in list_resp.json())
+
+    put_resp = client.put(
+        f"/inventory/{item['id']}",
+        json={"name": "Widget", "quantity": 25, "price": 11.0},
+    )
+    assert put_resp.status_code == 200
+    assert put_resp.json()["quantity"] == 25
+
+    patch_resp = client.patch(
+        f"/inventory/{item['id']}",
+        json={"price": 9.99},
+    )
+    assert patch_resp.status_code == 200
+    assert patch_resp.json()["price"] == 9.99
+
+    delete_resp = client.delete(f"/inventory/{item['id']}")
+    assert delete_resp.status_code == 204
+
+    list_after_delete = client.get("/inventory")
+    assert list_after_delete.status_code == 200
+    assert item["id"] not in {entry["id"] for entry in list_after_delete.json()}
 
 
 def test_order_crud_flow() -> None:
-    with get_client() as client:
-        first_item = client.post(
-            "/inventory",
-            json={"name": "Gear", "quantity": 5, "price": 20.0},
-        ).json()
-        second_item = client.post(
+    client = CLIENT
+    first_item = client.post(
+        "/inventory",
+        json={"name": "Gear", "quantity": 5, "price": 20.0},
+    ).json()
+    second_item = client.post(
+        "/inventory",
+        json={"name": "Bolt", "quantity": 50, "price": 1.5},
+    ).json()
+
+    create_resp = client.post(
+        "/orders",
+        json={
+            "customer": "Ada Lovelace",
+            "items": [first_item["id"], second_item["id"]],
+            "status": "pending",
+        },
+    )
+    assert create_resp.status_code == 201
+    order = create_resp.json()
+    assert order["customer"] == "Ada Lovelace"
+    assert len(order["items"]) == 2
+
+    read_resp = client.get(f"/orders/{order['id']}")
+    assert read_resp.status_code == 200
+    assert read_resp.json()["id"] == order["id"]
+
+    put_resp = client.put(
+        f"/orders/{order['id']}",
+        json={
+            "customer": "Ada Lovelace",
+            "items": [second_item["id"]],
+            "status": "confirmed",
+        },
+    )
+    assert put_resp.status_code == 200
+    assert put_resp.json()["status"] == "confirmed"
+
+    patch_resp = client.patch(
+        f"/orders/{order['id']}",
+        json={"status": "shipped"},
+    )
+    assert patch_resp.status_code == 200
+    assert patch_resp.json()["status"] == "shipped"
+
+    delete_resp = client.delete(f"/orders/{order['id']}")
+    assert delete_resp.status_code == 204
+
+    not_found_resp = client.get(f"/orders/{order['id']}")
+    assert not_found_resp.status_code == 404
+
+
+def test_reads_reflect_writes() -> None:
+    client = CLIENT
+    item = client.post(
+        "/inventory",
+        json={"name": "Sprocket", "quantity": 3, "price": 4.0},
+    ).json()
+    order = client.post(
+        "/orders",
+        json={"customer": "Grace Hopper", "items": [item["id"]]},
+    ).json()
+
+    assert client.get("/inventory").json() == [item]
+    assert client.get(f"/orders/{order['id']}").json()["items"] == [item["id"]]
+
+    client.patch(f"/inventory/{item['id']}", json={"quantity": 7})
+    assert client.get("/inventory").json()[0]["quantity"] == 7
+
+    client.delete(f"/inventory/{item['id']}")
+    assert client.get("/inventory").json() == []
+    assert client.get(f"/orders/{order['id']}").json()["items"] == []
+
+
+def test_inventory_delete_keeps_remaining_rows() -> None:
+    client = CLIENT
+    items = [
+        client.post(
             "/inventory",
-            json={"name": "Bolt", "quantity": 50, "price": 1.5},
+            json={"name": name, "quantity": quantity, "price": 1.0},
         ).json()
+        for name, quantity in (("Nut", 1), ("Washer", 2), ("Spring", 3))
+    ]
 
-        create_resp = client.post(
-            "/orders",
-            json={
-                "customer": "Ada Lovelace",
-                "items": [first_item["id"], second_item["id"]],
-                "status": "pending",
-            },
-        )
-        assert create_resp.status_code == 201
-        order = create_resp.json()
-        assert order["customer"] == "Ada Lovelace"
-        assert len(order["items"]) == 2
-
-        read_resp = client.get(f"/orders/{order['id']}")
-        assert read_resp.status_code == 200
-        assert read_resp.json()["id"] == order["id"]
-
-        put_resp = client.put(
-            f"/orders/{order['id']}",
-            json={
-                "customer": "Ada Lovelace",
-                "items": [second_item["id"]],
-                "status": "confirmed",
-            },
-        )
-        assert put_resp.status_code == 200
-        assert put_resp.json()["status"] == "confirmed"
+    assert client.delete(f"/inventory/{items[0]['id']}").status_code == 204
+    remaining = {entry["id"]: entry for entry in client.get("/inventory").json()}
+    assert remaining == {item["id"]: item for item in items[1:]}
+
+    patch_resp = client.patch(f"/inventory/{items[2]['id']}", json={"quantity": 9})
+    assert patch_resp.json() == {**items[2], "quantity": 9}
 
-        patch_resp = client.patch(
-            f"/orders/{order['id']}",
-            json={"status": "shipped"},
-        )
-        assert patch_resp.status_code == 200
-        assert patch_resp.json()["status"] == "shipped"
 
-        delete_resp = client.delete(f"/orders/{order['id']}")
-        assert delete_resp.status_code == 204
+def test_large_responses_are_compressed() -> None:
+    client = CLIENT
+    for index in range(20):
+        client.post(
+            "/inventory",
+            json={"name": f"Item {index}", "quantity": index, "price": 1.0},
+        )
 
-        not_found_resp = client.get(f"/orders/{order['id']}")
-        assert not_found_resp.status_code == 404
+    list_resp = client.get("/inventory", headers={"Accept-Encoding": "gzip"})
+    assert list_resp.headers["content-encoding"] == "gzip"
+    assert len(list_resp.json()) == 20
+
+    order = client.post(
+        "/orders",
+        json={"customer": "Ada Lovelace", "items": [1]},
+    ).json()
+    order_resp = client.get(f"/orders/{order['id']}", headers={"Accept-Encoding": "gzip"})
+    assert order_resp.status_code == 200
+    assert "content-encoding" not in order_resp.headers